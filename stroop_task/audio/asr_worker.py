@@ -0,0 +1,133 @@
+# A persistent process for transcribing recordings with faster_whisper.
+#
+# Transcription takes seconds even for quantized / distilled models. Running it
+# in a separate process keeps the paradigm's event loop responsive. The model
+# is loaded once when the worker starts and the audio is handed over via shared
+# memory instead of pickling it through the queue.
+
+import itertools
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from stroop_task.utils.logging import logger
+
+
+def _worker_loop(model_size: str, requests: mp.Queue, responses: mp.Queue):
+    """Transcribe requests until a `None` is received"""
+
+    # import here as this is running in the spawned process
+    from stroop_task.audio.record import _get_model, recording_to_dataframe
+
+    # load the model before the first request arrives, a failure is reported
+    # with the requests as they would fail on loading as well
+    try:
+        _get_model(model_size)
+    except Exception as err:
+        logger.error(f"ASR worker could not load {model_size=}: {err}")
+
+    while (req := requests.get()) is not None:
+        shm_name, dtype, shape, req_id, kwargs = req
+        shm = shared_memory.SharedMemory(name=shm_name)
+        # copy out so that the shared memory can be closed independent of any
+        # references faster_whisper might keep
+        rec16k = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+        shm.close()
+
+        try:
+            df = recording_to_dataframe(rec16k, model_size=model_size, **kwargs)
+            responses.put((req_id, df))
+        except Exception as err:
+            responses.put((req_id, err))
+
+
+class AsrWorker:
+    """Transcribe recordings in a separate, persistent process
+
+    Parameters
+    ----------
+    model_size : str
+        The faster_whisper model to use, see `configs/audio.yaml`.
+
+    """
+
+    def __init__(self, model_size: str):
+        mp_ctx = mp.get_context("spawn")
+        self.requests = mp_ctx.Queue()
+        self.responses = mp_ctx.Queue()
+        self.process = mp_ctx.Process(
+            target=_worker_loop,
+            args=(model_size, self.requests, self.responses),
+            daemon=True,
+        )
+        self.process.start()
+
+        self._req_ids = itertools.count()
+        self._shms: dict[int, shared_memory.SharedMemory] = {}
+        self._results: dict = {}
+
+    def submit(self, rec16k: np.ndarray, **kwargs) -> int:
+        """Post a 16kHz recording for transcription and return the request id.
+
+        The kwargs are passed to `recording_to_dataframe`.
+        """
+        req_id = next(self._req_ids)
+        shm = shared_memory.SharedMemory(create=True, size=rec16k.nbytes)
+        np.ndarray(rec16k.shape, dtype=rec16k.dtype, buffer=shm.buf)[:] = rec16k
+
+        # keep the shared memory alive until the worker answered
+        self._shms[req_id] = shm
+        self.requests.put((shm.name, rec16k.dtype.str, rec16k.shape, req_id, kwargs))
+
+        return req_id
+
+    def _collect(self, block: bool = False, timeout: float | None = None):
+        try:
+            req_id, res = self.responses.get(block=block, timeout=timeout)
+        except queue.Empty:
+            return
+
+        self._results[req_id] = res
+        shm = self._shms.pop(req_id)
+        shm.close()
+        shm.unlink()
+
+    def result_ready(self, req_id: int) -> bool:
+        """Check without blocking if the transcription for `req_id` is done"""
+        while req_id not in self._results and not self.responses.empty():
+            self._collect()
+        # a dead worker will not answer anymore, `result` raises for it
+        return req_id in self._results or not self.process.is_alive()
+
+    def result(self, req_id: int, timeout: float | None = None):
+        """Block until the transcription for `req_id` is done and return it"""
+        tstart = time.perf_counter()
+        while req_id not in self._results:
+            if not self.process.is_alive():
+                raise RuntimeError("ASR worker process died")
+            if timeout is not None and time.perf_counter() - tstart > timeout:
+                raise TimeoutError(f"No transcription for {req_id=} after {timeout=}")
+            self._collect(block=True, timeout=0.5)
+
+        res = self._results.pop(req_id)
+        if isinstance(res, Exception):
+            raise res
+
+        return res
+
+    def close(self):
+        """Stop the worker process and release pending shared memory"""
+        if self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                logger.warning("ASR worker did not stop, terminating it")
+                self.process.terminate()
+
+        for shm in self._shms.values():
+            shm.close()
+            shm.unlink()
+        self._shms.clear()
@@ -14,139 +14,336 @@
 # -> we use a bandpass filter an then just use a 4 level envelop to remove all
 #    personal specific content
 
-import datetime
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-import sounddevice as sd
-import yaml
 
+from stroop_task.audio.asr_worker import AsrWorker
+from stroop_task.utils.config import load_yaml
+from stroop_task.utils.logging import logger
 
-# from faster_whisper import WhisperModel
-from scipy import signal
+# pandas, scipy and sounddevice are imported where needed to keep importing this module
+# cheap, e.g. for the server process which never records
+if TYPE_CHECKING:
+    import pandas as pd
 
-from stroop_task.utils.logging import logger
+# language names as used for the configs/<language>.yaml mapped to Whisper codes
+WHISPER_LANGUAGE_CODES = {"english": "en", "dutch": "nl", "german": "de"}
 
-# def recording_to_dataframe(rec16k: np.ndarray) -> pd.DataFrame:
-#     """Model was trained on 16k data -> use resampled"""
-#
-#     model_size = "small"
-#     # model = WhisperModel(model_size, device="cpu", compute_type="int8")
-#     model = WhisperModel(model_size, device="cpu", compute_type="float32")
-#
-#     segments, info = model.transcribe(
-#         rec16k.flatten(),
-#         beam_size=8,
-#         word_timestamps=True,
-#     )
-#
-#     data = []
-#     for seg in segments:
-#         if seg is not None:
-#             for word in seg.words:
-#                 data.append(
-#                     {
-#                         "word_start": word.start,
-#                         "word_end": word.end,
-#                         "word": word.word,
-#                         "seg_start": seg.start,
-#                         "seg_end": seg.end,
-#                         "seg_text": seg.text,
-#                         "seg_id": seg.id,
-#                         "seg_avg_logprod": seg.avg_logprob,
-#                         "seg_compression_ratio": seg.compression_ratio,
-#                         "seg_no_speech_prob": seg.no_speech_prob,
-#                         "seg_temp": seg.temperature,
-#                     }
-#                 )
-#     df = pd.DataFrame(data)
-#
-#     return df
-#
+# (model, is_batched) loaded once per process on first use, see `_get_model`
+_WHISPER_MODELS: dict = {}
+_WHISPER_MODELS_LOCK = threading.Lock()
+
+# number of voiced chunks decoded at once if the model runs on GPU
+ASR_BATCH_SIZE = 8
+
+
+def _get_model(model_size: str) -> tuple:
+    """Load the Whisper model lazily and keep it for subsequent calls.
+
+    Returns the model and whether it is a batched pipeline.
+    """
+
+    with _WHISPER_MODELS_LOCK:
+        if model_size not in _WHISPER_MODELS:
+            # faster_whisper is an optional dependency, only needed for transcription
+            import ctranslate2
+            from faster_whisper import WhisperModel
+
+            # int8 quantization is the fastest path on CPU, int8_float16 on GPU. We
+            # only need to distinguish 4 color words, so the accuracy loss is irrelevant
+            if ctranslate2.get_cuda_device_count() > 0:
+                # on GPU, the voiced chunks of a recording are decoded in batches,
+                # BatchedInferencePipeline needs faster_whisper>=1.1.0
+                from faster_whisper import BatchedInferencePipeline
+
+                model = BatchedInferencePipeline(
+                    model=WhisperModel(
+                        model_size, device="cuda", compute_type="int8_float16"
+                    )
+                )
+                is_batched = True
+            else:
+                model = WhisperModel(
+                    model_size,
+                    device="cpu",
+                    compute_type="int8",
+                    cpu_threads=os.cpu_count() or 0,
+                    num_workers=1,
+                )
+                is_batched = False
+            _WHISPER_MODELS[model_size] = (model, is_batched)
+
+        return _WHISPER_MODELS[model_size]
+
+
+def recording_to_dataframe(
+    rec16k: np.ndarray,
+    model_size: str = "Systran/faster-distil-whisper-small.en",
+    language: str = "english",
+    words: list[str] | None = None,
+) -> "pd.DataFrame":
+    """Model was trained on 16k data -> use resampled. Distilled models are
+    trained for greedy decoding and support word timestamps.
+
+    Decoding is biased towards the color `words` via the initial prompt and the
+    language is fixed to skip the language detection pass.
+    """
+
+    import pandas as pd
+
+    model, is_batched = _get_model(model_size)
+    batch_kwargs = {"batch_size": ASR_BATCH_SIZE} if is_batched else {}
+
+    segments, info = model.transcribe(
+        rec16k.flatten(),
+        language=WHISPER_LANGUAGE_CODES.get(language, language),
+        task="transcribe",
+        beam_size=1,  # greedy decoding is sufficient for single color words
+        condition_on_previous_text=False,
+        initial_prompt=" ".join(words) if words else None,
+        word_timestamps=True,  # word onsets are persisted with the transcription
+        **batch_kwargs,
+    )
+
+    data = []
+    for seg in segments:
+        if seg is not None:
+            for word in seg.words:
+                data.append(
+                    {
+                        "word_start": word.start,
+                        "word_end": word.end,
+                        "word": word.word,
+                        "seg_start": seg.start,
+                        "seg_end": seg.end,
+                        "seg_text": seg.text,
+                        "seg_id": seg.id,
+                        "seg_avg_logprod": seg.avg_logprob,
+                        "seg_compression_ratio": seg.compression_ratio,
+                        "seg_no_speech_prob": seg.no_speech_prob,
+                        "seg_temp": seg.temperature,
+                    }
+                )
+    df = pd.DataFrame(data)
+
+    return df
 
 
 def recording_to_rectified(
     recording: np.ndarray, n_levels: int = 20, fs: int = 16_000, dt_mean_s: float = 0.02
-) -> np.ndarray:
+) -> tuple[np.ndarray, int]:
+    """Rectify to a staircase envelope of `n_levels` levels.
+
+    The envelope is constant over windows of `n_mean` samples, so only one value
+    per window is returned together with `n_mean`. Use `expand_rectified` to get
+    the envelope at the resolution of the recording.
+    """
 
     n_mean = int(dt_mean_s * fs)
+    recording = recording.ravel()
 
-    rec_abs_max = np.hstack(
-        [
-            np.abs(recording[i : i + n_mean]).max()
-            for i in range(0, len(recording), n_mean)
-        ]
-    )
+    # max over windows of n_mean samples as a single reduction over a 2D view
+    n_full = len(recording) // n_mean * n_mean
+    rec_abs_max = np.abs(recording[:n_full]).reshape(-1, n_mean).max(axis=1)
+    if n_full != len(recording):
+        rec_abs_max = np.append(rec_abs_max, np.abs(recording[n_full:]).max())
 
-    # repeat to get rectified signal with same shape as old
-    recording_rectified = np.repeat(rec_abs_max, n_mean)
+    # assure that we have only n_levels (equally spaced) - quantize the compact
+    # array before repeating to avoid full length temporaries
+    mn, mx = rec_abs_max.min(), rec_abs_max.max()
+    scale = n_levels / max(mx - mn, 1e-12)  # guard against silent recordings
+    rscaled = np.clip((rec_abs_max - mn) * scale, 0, n_levels).astype(np.uint8)
 
-    # assure that we have only n_levels (equally spaced)
-    rscaled = (
-        (
-            (recording_rectified - recording_rectified.min())
-            / (recording_rectified.max() - recording_rectified.min())
-        )
-        * n_levels
-    ).astype(
-        int  # here we reach the n_levels -> then scale back
-    )
-    # plt.plot(recording)
-    # plt.plot(recording_rectified)
-    # plt.plot(rscaled)
-    # plt.show()
+    return rscaled, n_mean
 
-    return rscaled
+
+def expand_rectified(rectified: np.ndarray, n_mean: int) -> np.ndarray:
+    """Repeat each window value of a rectified recording to get a signal with
+    the same shape as the original recording (plus the padded last window)"""
+    return np.repeat(rectified, n_mean)
+
+
+@lru_cache(maxsize=None)
+def resample_filter(up: int, down: int) -> np.ndarray:
+    """FIR low-pass filter for `signal.resample_poly`, designed once per rate pair.
+
+    This is the same filter `resample_poly` would design on each call with its
+    default kaiser window.
+    """
+    from scipy import signal
+
+    g = math.gcd(up, down)
+    max_rate = max(up, down) // g
+    h = signal.firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+    return h.astype(np.float32)
 
 
 class SpokenStroopRecorder:
-    def __init__(self):
-        self.cfg = yaml.safe_load(open("./configs/audio.yaml", "r"))
+    def __init__(self, language: str = "english", words: list[str] | None = None):
+        self.language = language
+        self.words = words
+        self.cfg = load_yaml("./configs/audio.yaml")
         self.fs = self.cfg["device"]["sfreq"]
-        self.rectified_recording: np.ndarray = np.empty(1)
-        self.df: pd.DataFrame = pd.DataFrame()
+        self.n_levels: int = 20  # number of levels of the rectified recording
+        self.rectified_recording: np.ndarray = np.empty(1)  # one value per window
+        self.rectified_n_mean: int = 1  # number of samples per window
+        self.df: "pd.DataFrame | None" = None
         self.transformed: bool = False
+        self.file_pd: Path | None = None  # transcription next to the persisted audio
+
+        # the model is either configured per language or as a single model
+        self.model_size: str | None = None
+        if self.cfg["asr"]["transcribe"]:
+            model = self.cfg["asr"]["model"]
+            self.model_size = model.get(language) if isinstance(model, dict) else model
+
+            if self.model_size is None:
+                logger.error(
+                    f"No asr.model configured for {language=} in configs/audio.yaml,"
+                    " the recording will not be transcribed"
+                )
+            elif self.model_size.endswith(".en") and language != "english":
+                logger.warning(
+                    f"The english only {self.model_size=} will transcribe the"
+                    f" {language=} recording as english, configure another model in"
+                    " configs/audio.yaml"
+                )
+
+        # transcription runs in a separate process which loads the model on start
+        self.asr_worker: AsrWorker | None = (
+            AsrWorker(self.model_size) if self.model_size is not None else None
+        )
+        self.asr_req_id: int | None = None
+        self.max_wait_s: float = self.cfg["asr"]["max_wait_s"]
 
     def record_for_s(self, duration_s: float):
-        self.rec = sd.rec(int(duration_s * self.fs), samplerate=self.fs, channels=1)
+        import sounddevice as sd
 
-    def transform(self):
-        self.rec16k = signal.resample(
-            self.rec.flatten(), num=int((len(self.rec) / self.fs) * 16_000)
+        # record in the native ADC format, converted to float32 for processing
+        self.rec = sd.rec(
+            int(duration_s * self.fs), samplerate=self.fs, channels=1, dtype="int16"
         )
+
+    def transform(self):
+        from scipy import signal
+
         logger.info("Transforming audio to rectified and transcription...")
-        self.rectified_recording = recording_to_rectified(self.rec)
-        logger.info("Transcribing sequence...")
-        # self.df = recording_to_dataframe(self.rec16k)  # type: ignore
+        rec_f32 = self.rec.ravel().astype(np.float32) / 32768.0
+
+        # rectification and resampling work on independent copies of the
+        # recording -> run them concurrently, both release the GIL in native code
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            fut_rect = pool.submit(
+                recording_to_rectified, rec_f32, n_levels=self.n_levels
+            )
+
+            # polyphase filtering is linear in time, contrary to the FFT based
+            # signal.resample
+            self.rec16k = signal.resample_poly(
+                rec_f32,
+                up=16_000,
+                down=self.fs,
+                window=resample_filter(16_000, self.fs),
+            )
+
+            if self.asr_worker is not None:
+                # only posts the recording, check with `result_ready` and collect
+                # with `persist_transcription`
+                logger.info("Transcribing sequence...")
+                self.asr_req_id = self.asr_worker.submit(
+                    self.rec16k, language=self.language, words=self.words
+                )
+
+            self.rectified_recording, self.rectified_n_mean = fut_rect.result()
+
         logger.info("Done.")
         self.transformed = True
 
-    def persist_accumulated(self):
+    def result_ready(self) -> bool:
+        """Check without blocking if a pending transcription is done"""
+        if self.asr_worker is None or self.asr_req_id is None:
+            return True
+        return self.asr_worker.result_ready(self.asr_req_id)
+
+    def persist_accumulated(self, wait_for_transcription: bool = True):
+        """Persist the raw and rectified recording. A pending transcription is
+        persisted afterwards, or later with `persist_transcription` if not
+        `wait_for_transcription`.
+        """
         if not self.transformed:
             self.transform()
 
-        logcfg = yaml.safe_load(open("./configs/logging.yaml", "r"))
-        pfx = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        logcfg = load_yaml("./configs/logging.yaml")
+        pfx = time.strftime("%Y%m%d_%H%M%S")
 
         file_raw_np = Path(logcfg["log_file"]).parent.joinpath(f"{pfx}_raw_audio.npy")
-        file_np = Path(logcfg["log_file"]).parent.joinpath(f"{pfx}_audio.npy")
-        file_pd = Path(logcfg["log_file"]).parent.joinpath(f"{pfx}_audio.tsv")
+        file_np = Path(logcfg["log_file"]).parent.joinpath(f"{pfx}_audio.npz")
+        self.file_pd = Path(logcfg["log_file"]).parent.joinpath(f"{pfx}_audio.tsv")
 
         logger.info(f"Persisting raw recording to {file_raw_np}")
         np.save(file_raw_np, self.rec)
         logger.info(f"Persisting rectified to {file_np}")
-        np.save(file_np, self.rectified_recording)
-        # logger.info(f"Persisting transcription to {file_pd}")
-        # self.df.to_csv(
-        #     file_pd, sep="\t"
-        # )  # choosing tab separated as this is standard in BIDS
+        # the rectified signal is a staircase of few levels -> compresses well
+        np.savez_compressed(
+            file_np,
+            rect=self.rectified_recording,
+            n_mean=self.rectified_n_mean,
+            fs=self.fs,
+            n_levels=self.n_levels,
+        )
+
+        if wait_for_transcription:
+            self.persist_transcription()
+
+    def persist_transcription(self, timeout: float | None = None):
+        """Wait for a pending transcription and persist it next to the audio
+        of `persist_accumulated`. A failed transcription is only logged, as the
+        audio is already persisted.
+        """
+        if self.asr_worker is None or self.asr_req_id is None:
+            return
+
+        req_id, self.asr_req_id = self.asr_req_id, None
+
+        logger.info("Waiting for transcription...")
+        try:
+            self.df = self.asr_worker.result(req_id, timeout=timeout)
+        except Exception as err:
+            logger.error(
+                f"Transcription failed, not persisting {self.file_pd}: {err!r}"
+            )
+            return
+
+        if not self.df.empty:
+            logger.info(f"Persisting transcription to {self.file_pd}")
+            self.df.to_csv(
+                self.file_pd, sep="\t"
+            )  # choosing tab separated as this is standard in BIDS
+
+    def close(self):
+        """Stop a running recording and the transcription worker if running"""
+        if hasattr(self, "rec"):
+            import sounddevice as sd
+
+            sd.stop()
+        if self.asr_worker is not None:
+            self.asr_worker.close()
 
 
 if __name__ == "__main__":
+    import sounddevice as sd
+    from scipy import signal
+
     duration = 5
-    cfg = yaml.safe_load(open("./configs/audio.yaml", "r"))
+    cfg = load_yaml("./configs/audio.yaml")
     fs = cfg["device"]["sfreq"]
 
     # test recording
@@ -154,7 +351,7 @@ if __name__ == "__main__":
     rec = sd.rec(int(duration * fs), samplerate=fs, channels=1)
     sd.wait()
     print("done")
-    rec16k = signal.resample(rec.flatten(), num=int((len(rec) / fs) * 16_000))
+    rec16k = signal.resample_poly(rec.flatten(), up=16_000, down=fs)
 
     sd.default.device = "MacBook Pro Speakers"
     sd.play(rec * 20)
@@ -1,18 +1,42 @@
+from __future__ import annotations
+
+import ast
+import itertools
 import json
 import random
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from re import split
 from typing import Literal
 
+import numpy as np
 import pyglet
-import yaml
 
+from stroop_task.utils.config import load_yaml
+from stroop_task.utils.label_pool import LabelPool
 from stroop_task.utils.logging import logger
 from stroop_task.utils.marker import MarkerWriter, get_marker_writer
 
+# version of the seeded block sequence, logged with each block so that data can be
+# matched to the sequence it was recorded with:
+#   1 - drawn with the random module, random.seed(1)
+#   2 - drawn with np.random.default_rng(1), same balance but a different sequence
+BLOCK_SEQUENCE_VERSION = 2
+
+# classical stimulus sequences by (n_stimuli, perc_incongruent, language, block_nr),
+# so that the json files are only read once per process
+_SEQUENCE_CACHE: dict[tuple, list[str]] = {}
+
 
-@dataclass
+def _to_rgba(color: tuple | list | str) -> tuple:
+    """Convert a color given as YAML list, e.g. [255, 0, 0, 255], or as string,
+    e.g. "(255, 0, 0, 255)", to the tuple pyglet expects"""
+    if isinstance(color, str):
+        color = ast.literal_eval(color)
+    return tuple(color)
+
+
+@dataclass(slots=True)
 class StroopContext:
     """
     A class to represent the context for the Stroop task.
@@ -22,7 +46,7 @@ class StroopContext:
     language : str
         The language setting for the Stroop task.
     word_color_dict : dict
-        A dictionary mapping words to their corresponding colors. See configs/<language>.yaml.
+        A dictionary mapping words to their corresponding RGBA color tuples. See configs/<language>.yaml.
     msgs : dict
         A dictionary containing messages for the Stroop task. See configs/<language>.yaml.
     startblock_mrk : int
@@ -83,14 +107,21 @@ class StroopContext:
         Width of the screen. See configs/gui.
     screen_height : int
         Height of the screen. See configs/gui.
-    tic : float
-        Time keeping variable.
-    tic_down : float
-        Time keeping variable for countdown.
+    tic_ns : int
+        Time keeping variable, stimulus onset from `time.perf_counter_ns`.
+    tic_down_ns : int
+        Time keeping variable for countdown, from `time.perf_counter_ns`.
     marker_writer : MarkerWriter
         Marker writer for the Stroop task.
+    window : pyglet.window.BaseWindow | None
+        The window to draw to, attached via `add_window`.
     has_window_attached : bool
         Flag indicating if a window is attached.
+    label_pool : LabelPool
+        Pool of labels reused for the classical table and its examples.
+    scene_batch : pyglet.graphics.Batch
+        Batch shared by the instruction screens and the classical table. Each of
+        these scenes has its own group, see `show_scene`.
     block_nr: int (default: 1)
         The current block number, used as seed for random generation of the
         classical Stroop table
@@ -145,346 +176,334 @@ class StroopContext:
     screen_height: int = 600
 
     # time keeping
-    tic: float = 0
-    tic_down: float = 0
+    tic_ns: int = 0
+    tic_down_ns: int = 0
 
     marker_writer: MarkerWriter = field(default_factory=get_marker_writer)
+    window: pyglet.window.BaseWindow | None = None
     has_window_attached: bool = False
+    label_pool: LabelPool = field(default_factory=LabelPool)
+    # inputs the current stimuli were created from
+    _stimuli_sig: tuple | None = field(default=None, init=False, repr=False)
+    scene_batch: pyglet.graphics.Batch | None = field(default=None, init=False)
+    _scene_groups: dict = field(default_factory=dict, init=False, repr=False)
+    # drawables created for each scene, removed together with the scene
+    _scene_drawables: dict[str, list] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _n_scene_groups: int = field(default=0, init=False, repr=False)
 
     def add_window(self, wd: pyglet.window.BaseWindow):
         self.window = wd
         self.has_window_attached = True
 
+    def new_scene_group(self, scene: str) -> pyglet.graphics.Group:
+        """Create a hidden group for `scene` in the shared `scene_batch`. The
+        drawables of the scene are created with `create_in_scene`, or tracked
+        with `add_to_scene`.
+
+        Whatever was drawn with a previous group of the same scene is deleted, or
+        returned to the `label_pool`, as it would otherwise stay in the batch.
+        """
+        if self.scene_batch is None:
+            self.scene_batch = pyglet.graphics.Batch()
+
+        self.clear_scene(scene)
+
+        # pyglet considers groups with the same order and parent equal -> each
+        # scene group needs its own order to not be merged within the batch
+        group = pyglet.graphics.Group(order=self._n_scene_groups)
+        group.visible = False
+        self._n_scene_groups += 1
+        self._scene_groups[scene] = group
+        self._scene_drawables[scene] = []
+
+        return group
+
+    def add_to_scene(self, scene: str, drawable):
+        """Track `drawable` as part of `scene` and return it"""
+        self._scene_drawables[scene].append(drawable)
+        return drawable
+
+    def create_in_scene(self, scene: str, cls, *args, **kwargs):
+        """Create a drawable, e.g. a `pyglet.text.Label`, in the group of `scene`"""
+        drawable = cls(
+            *args, batch=self.scene_batch, group=self._scene_groups[scene], **kwargs
+        )
+        return self.add_to_scene(scene, drawable)
+
+    def clear_scene(self, scene: str):
+        """Remove the drawables of `scene` from the `scene_batch`"""
+        group = self._scene_groups.pop(scene, None)
+        if group is None:
+            return
+
+        group.visible = False
+        for stim in self._scene_drawables.pop(scene):
+            # pool labels might have been released and handed out again already
+            if stim.group is group and stim.batch is self.scene_batch:
+                if self.label_pool.is_active(stim):
+                    self.label_pool.release(stim)
+                else:
+                    stim.delete()
+
+    def show_scene(self, scene: str) -> pyglet.graphics.Batch:
+        """Make only `scene` visible and return the batch to draw for it"""
+        for name, group in self._scene_groups.items():
+            group.visible = name == scene
+
+        return self.scene_batch
+
     def create_stimuli(self, random_wait: bool = False):
         """Create stimuli for the stroop task using WORD_COLOR_PAIRS from self.word_color_dict"""
+        width, height = self.window.width, self.window.height
+        cx, cy = width // 2, height // 2
+
+        # nothing to do if the stimuli were already created with the same inputs
+        sig = (
+            tuple(self.word_color_dict.items()),
+            tuple(self.msgs.items()),
+            self.language,
+            self.focus,
+            self.font_size,
+            self.instruction_font_size,
+            self.white_y_offset_px,
+            id(self.window),
+            width,
+            height,
+            random_wait,
+        )
+        if sig == self._stimuli_sig and self.known_stimuli:
+            return
+
+        # all word stimuli share the layout, only text, color and y differ
+        word_label = partial(
+            pyglet.text.Label,
+            font_size=self.font_size,
+            x=cx,
+            y=cy,
+            anchor_x="center",
+            anchor_y="center",
+        )
 
         stimuli = {
             "fixation": pyglet.text.Label(
                 text="+",
                 color=(80, 80, 80, 255),
                 font_size=56,
-                x=self.window.width // 2,
-                y=self.window.height // 2,
+                x=cx,
+                y=cy,
                 anchor_x="center",
                 anchor_y="center",
             ),
             "coherent": {
-                cw: pyglet.text.Label(
-                    text=cw,
-                    color=eval(cc),  # string to tuple
-                    font_size=self.font_size,
-                    x=self.window.width // 2,
-                    y=self.window.height // 2,
-                    anchor_x="center",
-                    anchor_y="center",
-                )
+                cw: word_label(text=cw, color=cc)
                 for cw, cc in self.word_color_dict.items()
             },
             "neutral": {
-                cw: pyglet.text.Label(
-                    text="XXXX",
-                    color=eval(cc),  # string to tuple
-                    font_size=self.font_size,
-                    x=self.window.width // 2,
-                    y=self.window.height // 2,
-                    anchor_x="center",
-                    anchor_y="center",
-                )
+                cw: word_label(text="XXXX", color=cc)
                 for cw, cc in self.word_color_dict.items()
             },
             "white": {
-                cw: pyglet.text.Label(
+                cw: word_label(
                     text=cw,
                     color=(255, 255, 255, 255),
-                    font_size=self.font_size,
-                    x=self.window.width // 2,
-                    y=self.window.height // 2 - self.white_y_offset_px,
-                    anchor_x="center",
-                    anchor_y="center",
+                    y=cy - self.white_y_offset_px,
                 )
-                for cw, _ in self.word_color_dict.items()
+                for cw in self.word_color_dict
+            },
+            # permute the colors for the incorherent stimuli
+            "incoherent": {
+                f"{cw}_{cw2}": word_label(text=cw, color=self.word_color_dict[cw2])
+                for cw, cw2 in itertools.permutations(self.word_color_dict, 2)
             },
-            "incoherent": {},
         }
 
-        # permute the colors for the incorherent stimuli
-        for cw, _ in self.word_color_dict.items():
-            for cw2, cc2 in self.word_color_dict.items():
-                if cw2 != cw:
-                    stimuli["incoherent"][f"{cw}_{cw2}"] = pyglet.text.Label(
-                        text=cw,
-                        color=eval(cc2),  # string to tuple
-                        font_size=self.font_size,
-                        x=self.window.width // 2,
-                        y=self.window.height // 2,
-                        anchor_x="center",
-                        anchor_y="center",
-                    )
+        # all scenes are built from the stimuli -> remove those of the old ones
+        for scene in list(self._scene_groups):
+            self.clear_scene(scene)
 
         self.known_stimuli = stimuli
         self.add_instruction_screen_batch(random_wait=random_wait)
+        self._stimuli_sig = sig
 
     def add_instruction_screen_batch(self, random_wait: bool = False):
         """Load all components and add them to an intro batch"""
-
-        instruction_batch = pyglet.graphics.Batch()
+        width, height = self.window.width, self.window.height
+        example_font_size = int(self.instruction_font_size * 1.2)
+        y_example_top, y_example_bot = height // 16 * 9, height // 16 * 8
+
+        self.new_scene_group("instruction")
+        scene_drawable = partial(self.create_in_scene, "instruction")
+        sprites = []  # the finger images, scaled at the end
+
+        # all instruction texts are white in the instruction font, the reaction
+        # texts are columns next to the finger images
+        instruction_label = partial(
+            scene_drawable,
+            pyglet.text.Label,
+            color=(255, 255, 255, 255),
+            font_size=self.instruction_font_size,
+        )
+        column_label = partial(
+            instruction_label, anchor_x="left", anchor_y="top", multiline=True
+        )
 
         # -> we also need to store each stimulus separately
-        self.known_stimuli["instruction_header"] = pyglet.text.Label(
+        self.known_stimuli["instruction_header"] = instruction_label(
             text=self.msgs["instruction_headline"],
-            color=(255, 255, 255, 255),
-            font_size=self.instruction_font_size,
-            x=self.window.width // 2,
-            y=int(self.window.height // 10 * 9),
+            x=width // 2,
+            y=int(height // 10 * 9),
             anchor_x="center",
             anchor_y="center",
-            batch=instruction_batch,
-            width=int(self.window.width * 0.9),
+            width=int(width * 0.9),
             multiline=True,
         )
 
-        self.known_stimuli["instruction_footer"] = pyglet.text.Label(
+        self.known_stimuli["instruction_footer"] = instruction_label(
             text=self.msgs["instruction_footer"],
-            color=(255, 255, 255, 255),
-            font_size=self.instruction_font_size,
-            x=self.window.width // 2,
-            y=int(self.window.height // 12),
+            x=width // 2,
+            y=int(height // 12),
             anchor_x="center",
             anchor_y="center",
-            batch=instruction_batch,
         )
 
         if random_wait:
             # only congruent / incongruent instruction needed
 
-            congruent_image_x = self.window.width // 6 * 4
-            incongruent_image_x = self.window.width // 6
+            congruent_image_x = width // 6 * 4
+            incongruent_image_x = width // 6
 
-            self.known_stimuli["instruction_incongruent"] = pyglet.text.Label(
+            self.known_stimuli["instruction_incongruent"] = column_label(
                 text=self.msgs["incongruent_reaction_color_focus"],
-                color=(255, 255, 255, 255),
-                font_size=self.instruction_font_size,
                 x=incongruent_image_x,
-                y=self.window.height // 4 * 3,
-                anchor_x="left",
-                anchor_y="top",
-                batch=instruction_batch,
-                width=self.window.width // 4,
-                multiline=True,
+                y=height // 4 * 3,
+                width=width // 4,
             )
 
-            self.known_stimuli["instruction_congruent"] = pyglet.text.Label(
+            self.known_stimuli["instruction_congruent"] = column_label(
                 text=self.msgs["congruent_reaction_color_focus"],
-                color=(255, 255, 255, 255),
-                font_size=self.instruction_font_size,
                 x=congruent_image_x,
-                y=self.window.height // 4 * 3,
-                anchor_x="left",
-                anchor_y="top",
-                batch=instruction_batch,
-                width=self.window.width // 4,
-                multiline=True,
+                y=height // 4 * 3,
+                width=width // 4,
             )
 
         else:
-            incongruent_image_x = int((self.window.width // 7) * 3)
-            congruent_image_x = int((self.window.width // 7) * 5)
+            incongruent_image_x = int((width // 7) * 3)
+            congruent_image_x = int((width // 7) * 5)
 
-            self.known_stimuli["instruction_incongruent"] = pyglet.text.Label(
+            self.known_stimuli["instruction_incongruent"] = column_label(
                 text=(
                     self.msgs["incongruent_reaction_color_focus"]
                     if self.focus == "color"
                     else self.msgs["incongruent_reaction_text_focus"]
                 ),
-                color=(255, 255, 255, 255),
-                font_size=self.instruction_font_size,
                 x=incongruent_image_x,
-                y=self.window.height // 5 * 4,
-                anchor_x="left",
-                anchor_y="top",
-                batch=instruction_batch,
-                width=self.window.width // 5,
-                multiline=True,
+                y=height // 5 * 4,
+                width=width // 5,
             )
 
-            self.known_stimuli["instruction_congruent"] = pyglet.text.Label(
+            self.known_stimuli["instruction_congruent"] = column_label(
                 text=(
                     self.msgs["congruent_reaction_color_focus"]
                     if self.focus == "color"
                     else self.msgs["congruent_reaction_text_focus"]
                 ),
-                color=(255, 255, 255, 255),
-                font_size=self.instruction_font_size,
                 x=congruent_image_x,
-                y=self.window.height // 5 * 4,
-                anchor_x="left",
-                anchor_y="top",
-                batch=instruction_batch,
-                width=self.window.width // 5,
-                multiline=True,
+                y=height // 5 * 4,
+                width=width // 5,
             )
-            self.known_stimuli["press_down_instruction"] = pyglet.text.Label(
+            self.known_stimuli["press_down_instruction"] = column_label(
                 text=self.msgs["press_down_instruction"],
-                color=(255, 255, 255, 255),
-                font_size=self.instruction_font_size,
-                x=self.window.width // 7,
-                y=self.window.height // 5 * 4,
-                anchor_x="left",
-                anchor_y="top",
-                batch=instruction_batch,
-                width=self.window.width // 5,
-                multiline=True,
+                x=width // 7,
+                y=height // 5 * 4,
+                width=width // 5,
             )
             self.known_stimuli["instruction_fixation"] = (
-                pyglet.text.Label(
+                scene_drawable(
+                    pyglet.text.Label,
                     text="+",
                     color=(80, 80, 80, 255),
                     font_size=int(self.instruction_font_size * 1.5),
-                    x=self.window.width // 7 + self.window.width // 14,
-                    y=(self.window.height // 16 * 9),
+                    x=width // 7 + width // 14,
+                    y=y_example_top,
                     anchor_x="center",
                     anchor_y="top",
-                    batch=instruction_batch,
                 ),
             )
 
-            self.known_stimuli["instruction_finger_down_img"] = pyglet.sprite.Sprite(
+            self.known_stimuli["instruction_finger_down_img"] = scene_drawable(
+                pyglet.sprite.Sprite,
                 pyglet.image.load("./stroop_task/assets/finger_down.png"),
-                x=self.window.width // 7,
-                y=self.window.height // 8,
-                batch=instruction_batch,
+                x=width // 7,
+                y=height // 8,
             )
+            sprites.append(self.known_stimuli["instruction_finger_down_img"])
 
         # examples of congruent and incongruent
-        coh_key = list(self.known_stimuli["coherent"].keys())[0]
-        incoh_key = list(self.known_stimuli["incoherent"].keys())[0]
-
-        # if text focus - take incongruent but matching word for correct
+        coh_key = next(iter(self.known_stimuli["coherent"]))
+        incoh_key = next(iter(self.known_stimuli["incoherent"]))
+        incoh_head, _ = incoh_key.split("_")
+
+        # examples are centered above the finger images
+        x_congruent = congruent_image_x + width // 14
+        x_incongruent = incongruent_image_x + width // 14
+        coherent = self.known_stimuli["coherent"]
+        incoherent = self.known_stimuli["incoherent"]
+        white = self.known_stimuli["white"]
+
+        # (name, template stimulus, x, y) of the examples
         if self.focus == "color":
-            self.known_stimuli["instruction_example_congruent_top"] = pyglet.text.Label(
-                text=self.known_stimuli["coherent"][coh_key].text,
-                color=self.known_stimuli["coherent"][coh_key].color,
-                font_size=int(self.instruction_font_size * 1.2),
-                x=congruent_image_x + self.window.width // 14,
-                y=(self.window.height // 16 * 9),
-                anchor_x="center",
-                anchor_y="center",
-                batch=instruction_batch,
-            )
-
-            self.known_stimuli["instruction_example_congruent_bot"] = pyglet.text.Label(
-                text=self.known_stimuli["white"][coh_key].text,
-                color=self.known_stimuli["white"][coh_key].color,
-                font_size=int(self.instruction_font_size * 1.2),
-                x=congruent_image_x + self.window.width // 14,
-                y=(self.window.height // 16 * 8),
-                anchor_x="center",
-                anchor_y="center",
-                batch=instruction_batch,
-            )
-
-            self.known_stimuli["instruction_example_incogruent_top"] = (
-                pyglet.text.Label(
-                    text=self.known_stimuli["incoherent"][incoh_key].text,
-                    color=self.known_stimuli["incoherent"][incoh_key].color,
-                    font_size=int(self.instruction_font_size * 1.2),
-                    x=incongruent_image_x + self.window.width // 14,
-                    y=(self.window.height // 16 * 9),
-                    anchor_x="center",
-                    anchor_y="center",
-                    batch=instruction_batch,
-                )
-            )
-
-            self.known_stimuli["instruction_example_incongruent_bot"] = (
-                pyglet.text.Label(
-                    text=self.known_stimuli["white"][coh_key].text,
-                    color=self.known_stimuli["white"][coh_key].color,
-                    font_size=int(self.instruction_font_size * 1.2),
-                    x=incongruent_image_x + self.window.width // 14,
-                    y=(self.window.height // 16 * 8),
-                    anchor_x="center",
-                    anchor_y="center",
-                    batch=instruction_batch,
-                )
-            )
-
-        if self.focus == "text":
-            self.known_stimuli["instruction_example_congruent_top"] = pyglet.text.Label(
-                text=self.known_stimuli["incoherent"][incoh_key].text,
-                color=self.known_stimuli["incoherent"][incoh_key].color,
-                font_size=int(self.instruction_font_size * 1.2),
-                x=congruent_image_x + self.window.width // 14,
-                y=(self.window.height // 16 * 9),
-                anchor_x="center",
-                anchor_y="center",
-                batch=instruction_batch,
-            )
-
-            self.known_stimuli["instruction_example_congruent_bot"] = pyglet.text.Label(
-                text=self.known_stimuli["white"][incoh_key.split("_")[0]].text,
-                color=self.known_stimuli["white"][incoh_key.split("_")[0]].color,
-                font_size=int(self.instruction_font_size * 1.2),
-                x=congruent_image_x + self.window.width // 14,
-                y=(self.window.height // 16 * 8),
-                anchor_x="center",
-                anchor_y="center",
-                batch=instruction_batch,
-            )
-
-            self.known_stimuli["instruction_example_incogruent_top"] = (
-                pyglet.text.Label(
-                    text=self.known_stimuli["coherent"][coh_key].text,
-                    font_size=int(self.instruction_font_size * 1.2),
-                    color=self.known_stimuli["coherent"][coh_key].color,
-                    x=incongruent_image_x + self.window.width // 14,
-                    y=(self.window.height // 16 * 9),
-                    anchor_x="center",
-                    anchor_y="center",
-                    batch=instruction_batch,
-                )
-            )
-
-            # just get a word that does not match
-            other_word = [
-                w for w in self.known_stimuli["white"].keys() if w != coh_key
-            ][0]
-
-            self.known_stimuli["instruction_example_incongruent_bot"] = (
-                pyglet.text.Label(
-                    text=self.known_stimuli["white"][other_word].text,
-                    color=self.known_stimuli["white"][other_word].color,
-                    font_size=int(self.instruction_font_size * 1.2),
-                    x=incongruent_image_x + self.window.width // 14,
-                    y=(self.window.height // 16 * 8),
-                    anchor_x="center",
-                    anchor_y="center",
-                    batch=instruction_batch,
-                )
+            examples = [
+                ("congruent_top", coherent[coh_key], x_congruent, y_example_top),
+                ("congruent_bot", white[coh_key], x_congruent, y_example_bot),
+                ("incogruent_top", incoherent[incoh_key], x_incongruent, y_example_top),
+                ("incongruent_bot", white[coh_key], x_incongruent, y_example_bot),
+            ]
+        else:
+            # if text focus - take incongruent but matching word for correct,
+            # and just get a word that does not match for incorrect
+            other_word = next(w for w in white if w != coh_key)
+            examples = [
+                ("congruent_top", incoherent[incoh_key], x_congruent, y_example_top),
+                ("congruent_bot", white[incoh_head], x_congruent, y_example_bot),
+                ("incogruent_top", coherent[coh_key], x_incongruent, y_example_top),
+                ("incongruent_bot", white[other_word], x_incongruent, y_example_bot),
+            ]
+
+        example_label = partial(
+            scene_drawable,
+            pyglet.text.Label,
+            font_size=example_font_size,
+            anchor_x="center",
+            anchor_y="center",
+        )
+        for name, template_stim, x, y in examples:
+            self.known_stimuli[f"instruction_example_{name}"] = example_label(
+                text=template_stim.text, color=template_stim.color, x=x, y=y
             )
 
         # --- add the example images
-        self.known_stimuli["instruction_finger_left_img"] = pyglet.sprite.Sprite(
+        self.known_stimuli["instruction_finger_left_img"] = scene_drawable(
+            pyglet.sprite.Sprite,
             pyglet.image.load("./stroop_task/assets/finger_left.png"),
             x=incongruent_image_x,
-            y=self.window.height // 8,
-            batch=instruction_batch,
+            y=height // 8,
         )
-        self.known_stimuli["instruction_finger_right_img"] = pyglet.sprite.Sprite(
+        self.known_stimuli["instruction_finger_right_img"] = scene_drawable(
+            pyglet.sprite.Sprite,
             pyglet.image.load("./stroop_task/assets/finger_right.png"),
             x=congruent_image_x,
-            y=self.window.height // 8,
-            batch=instruction_batch,
+            y=height // 8,
         )
+        sprites.append(self.known_stimuli["instruction_finger_left_img"])
+        sprites.append(self.known_stimuli["instruction_finger_right_img"])
 
         # scale the images to 1/6 of the screens width
-        for k, v in self.known_stimuli.items():
-            if k.endswith("img"):
-                sfactor = (1 / 6) * self.window.width / v.width
-                v.width = v.width * sfactor
-                v.height = v.height * sfactor
+        for sprite in sprites:
+            sprite.scale = (width / 6) / sprite.image.width
 
-        self.known_stimuli["instruction_batch"] = instruction_batch
+        self.known_stimuli["instruction_batch"] = self.scene_batch
 
     def init_block_stimuli(self, n_trials: int):
         """Initialize a block of trials by modifying a context. The stimuli will
@@ -519,53 +538,54 @@ class StroopContext:
 
         stimuli = []
         n_each = n_trials // 3
-        random.seed(
-            1
-        )  # work with a fixed seed to reproduce and have same stimuli for all
-        for stim_dict in [coherent_stimuli, incoherent_stimuli, neutral_stimuli]:
-
-            if stim_dict == coherent_stimuli:
-                stim_aux = [
-                    (cw + "_" + cw, stim_dict[cw])
-                    for cw, _ in stim_dict.items()
-                    for _ in range(n_each)
-                ]
-            elif stim_dict == neutral_stimuli:
-                stim_aux = [
-                    (("XXXX_" + cw, stim_dict[cw]))
-                    for cw, _ in stim_dict.items()
-                    for _ in range(n_each)
-                ]
-
+        words = list(white_stimuli.keys())
+        n_words = len(words)
+
+        # work with a fixed seed to reproduce and have same stimuli for all
+        rng = np.random.default_rng(1)
+        for category, stim_dict in [
+            ("coherent", coherent_stimuli),
+            ("incoherent", incoherent_stimuli),
+            ("neutral", neutral_stimuli),
+        ]:
+
+            # names of the top stimuli and the index of the color word they show
+            if category == "coherent":
+                names = [cw + "_" + cw for cw in stim_dict]
+                color_idx = np.arange(n_words)
+            elif category == "neutral":
+                names = ["XXXX_" + cw for cw in stim_dict]
+                color_idx = np.arange(n_words)
             else:  # incoherent
-                stim_aux = [
-                    (cw, stim_dict[cw])
-                    for cw, _ in stim_dict.items()
-                    for _ in range(n_each)
-                ]
+                names = list(stim_dict)
+                color_idx = np.asarray([words.index(k.split("_")[1]) for k in names])
 
-            pick_idx = random.sample(range(len(stim_aux)), n_each)
-            top_stims = [stim_aux[i] for i in pick_idx]
+            stims = list(stim_dict.values())
 
-            match_vect = [0, 1] * (n_each // 2)
-            random.shuffle(match_vect)
-
-            tstim = []
-            for (cw_top, stim_top), match in zip(top_stims, match_vect):
-                cwt = cw_top.split("_")[1]
-
-                if match == 1:
-                    cw_bot = cwt
+            # draw without replacement from n_each copies of each stimulus, the
+            # i-th copy belongs to stimulus i // n_each -> no need to build them
+            pick_idx = (
+                rng.choice(len(names) * n_each, size=n_each, replace=False) // n_each
+            )
 
-                else:
-                    cw_bot = random.choice(
-                        [cw for cw in white_stimuli.keys() if cw != cwt]
-                    )
+            # lower word correct in 50% of the time, otherwise shifting by
+            # 1..n_words-1 gives a random different word
+            match = rng.permutation(np.tile([True, False], n_each // 2))
+            top_color_idx = color_idx[pick_idx]
+            bot_idx = np.where(
+                match,
+                top_color_idx,
+                (top_color_idx + rng.integers(1, n_words, size=n_each)) % n_words,
+            )
 
-                stimuli.append((cw_top, stim_top, cw_bot, white_stimuli[cw_bot]))
+            stimuli += [
+                (names[i], stims[i], words[j], white_stimuli[words[j]])
+                for i, j in zip(pick_idx.tolist(), bot_idx.tolist())
+            ]
 
-        random.shuffle(stimuli)
+        stimuli = [stimuli[i] for i in rng.permutation(len(stimuli))]
 
+        logger.info(f"Drawing block stimuli with {BLOCK_SEQUENCE_VERSION=}")
         logger.debug(f"block stimuli: {stimuli}")
         self.block_stimuli = stimuli
 
@@ -597,6 +617,8 @@ class StroopContext:
         -------
         None
         """
+        width, height = self.window.width, self.window.height
+
         file = Path(
             f"./stroop_task/assets/classical_list_nstim-{n_stimuli}_perc_incongruent-{perc_incongruent:.2f}_lang-{self.language}_block-{self.block_nr}.json"
         )
@@ -605,27 +627,31 @@ class StroopContext:
         incoherent_stimuli = self.known_stimuli["incoherent"]
         all_stims = {**coherent_stimuli, **incoherent_stimuli}
 
-        if file.exists():
+        seq_key = (n_stimuli, perc_incongruent, self.language, self.block_nr)
+        if seq_key in _SEQUENCE_CACHE:
+            stimuli = _SEQUENCE_CACHE[seq_key]
+        elif file.exists():
             logger.debug(f"Loading stimuli from {file}")
             stimuli = json.load(open(file, "r"))["sequence"]
         else:
             logger.debug(
-                f"Creating classical stimuli file at: {file} - random.seed({self.block_nr})"
+                f"Creating classical stimuli file at: {file} - random.Random({self.block_nr})"
             )
-            random.seed(self.block_nr)
+            rng = random.Random(self.block_nr)
 
             # fix seed to keep creation stable
             n_incoherent = int(n_stimuli * perc_incongruent)
             n_coherent = n_stimuli - n_incoherent
 
-            stimuli = random.choices(
+            stimuli = rng.choices(
                 list(coherent_stimuli.keys()), k=n_coherent
-            ) + random.choices(list(incoherent_stimuli.keys()), k=n_incoherent)
+            ) + rng.choices(list(incoherent_stimuli.keys()), k=n_incoherent)
 
-            random.shuffle(stimuli)
+            rng.shuffle(stimuli)
 
             json.dump({"sequence": stimuli}, open(file, "w"))
 
+        _SEQUENCE_CACHE[seq_key] = stimuli
         logger.info(f"Using following stimuli for the classical task: {stimuli}")
 
         # sort into rows
@@ -634,29 +660,36 @@ class StroopContext:
         ]
 
         # batch stimuli together
-        cell_width = self.window.width / n_per_row
-        cell_height = self.window.height / len(stimuli_arranged)
-
-        batch = pyglet.graphics.Batch()
+        cell_width = width / n_per_row
+        cell_height = height / len(stimuli_arranged)
+
+        # cell centers, rows from top to bottom
+        xs = ((np.arange(n_per_row) + 1 / 2) * cell_width).tolist()
+        ys = (
+            height - (np.arange(len(stimuli_arranged)) + 1 / 2) * cell_height
+        ).tolist()
+
+        # labels of a previous table go back to the pool with its scene group
+        group = self.new_scene_group("classical")
+        batch = self.scene_batch
         labels = []
-        for irow, row in enumerate(stimuli_arranged):
-            for icol, stim in enumerate(row):
+        for y, row in zip(ys, stimuli_arranged):
+            for x, stim in zip(xs, row):
                 template_stim = all_stims[stim]
 
                 # create a new one as stimuli contain c-pointers, which we cannot use deepcopy for
-                text_label = pyglet.text.Label(
+                text_label = self.label_pool.get(
                     text=template_stim.text,
                     color=template_stim.color,
                     font_size=template_stim.font_size,
-                    x=(icol + 1 / 2) * cell_width,  # +1/2 to provide center
-                    y=self.window.height - (irow + 1 / 2) * cell_height,
-                    anchor_x="center",
-                    anchor_y="center",
+                    x=x,
+                    y=y,
                     batch=batch,
+                    group=group,
                 )
 
                 # sort top left to bottom right
-                labels.append(text_label)
+                labels.append(self.add_to_scene("classical", text_label))
 
         self.known_stimuli["classical_batch"] = batch
         self.known_stimuli["classical_labels"] = (
@@ -665,8 +698,11 @@ class StroopContext:
 
     def add_instruction_screen_batch_classical(self):
 
-        instruction_batch_classical = pyglet.graphics.Batch()
-        self.known_stimuli["instruction_header_classical"] = pyglet.text.Label(
+        instruction_group = self.new_scene_group("instruction_classical")
+        scene_drawable = partial(self.create_in_scene, "instruction_classical")
+        instruction_batch_classical = self.scene_batch
+        self.known_stimuli["instruction_header_classical"] = scene_drawable(
+            pyglet.text.Label,
             text=self.msgs["instruction_headline_classical"],
             color=(255, 255, 255, 255),
             font_size=self.instruction_font_size,
@@ -674,12 +710,12 @@ class StroopContext:
             y=int(self.window.height // 10 * 9),
             anchor_x="center",
             anchor_y="center",
-            batch=instruction_batch_classical,
             width=int(self.window.width * 0.9),
             multiline=True,
         )
 
-        self.known_stimuli["instruction_footer"] = pyglet.text.Label(
+        self.known_stimuli["instruction_footer_classical"] = scene_drawable(
+            pyglet.text.Label,
             text=self.msgs["instruction_footer"],
             color=(255, 255, 255, 255),
             font_size=self.instruction_font_size,
@@ -687,33 +723,39 @@ class StroopContext:
             y=int(self.window.height // 12),
             anchor_x="center",
             anchor_y="center",
-            batch=instruction_batch_classical,
             width=int(self.window.width * 0.9),
             multiline=True,
         )
 
-        self.create_classical_examples_to_batch(instruction_batch_classical)
+        self.create_classical_examples_to_batch(
+            instruction_batch_classical, group=instruction_group
+        )
+        for label in self.known_stimuli["classical_labels_intro"]:
+            self.add_to_scene("instruction_classical", label)
 
         self.known_stimuli["instruction_batch_classical"] = instruction_batch_classical
 
-    def create_classical_examples_to_batch(self, batch):
+    def create_classical_examples_to_batch(
+        self, batch: pyglet.graphics.Batch, group: pyglet.graphics.Group | None = None
+    ):
         """Not the full table just a few examples for the instruction screen"""
+        width, height = self.window.width, self.window.height
 
         coherent_stimuli = self.known_stimuli["coherent"]
         incoherent_stimuli = self.known_stimuli["incoherent"]
         all_stims = {**coherent_stimuli, **incoherent_stimuli}
 
-        random.seed(1)
+        rng = random.Random(1)
 
         # fix seed to keep creation stable
         n_incoherent = 6
         n_coherent = 6
 
-        stimuli = random.choices(
+        stimuli = rng.choices(
             list(coherent_stimuli.keys()), k=n_coherent
-        ) + random.choices(list(incoherent_stimuli.keys()), k=n_incoherent)
+        ) + rng.choices(list(incoherent_stimuli.keys()), k=n_incoherent)
 
-        random.shuffle(stimuli)
+        rng.shuffle(stimuli)
 
         n_per_row = 4
         stimuli_arranged = [
@@ -721,27 +763,32 @@ class StroopContext:
         ]
 
         # batch stimuli together
-        cell_width = self.window.width / (n_per_row + 2)
-        cell_height = (self.window.height / 2) / len(
-            stimuli_arranged
-        )  # only fill half a screen
+        cell_width = width / (n_per_row + 2)
+        cell_height = (height / 2) / len(stimuli_arranged)  # only fill half a screen
+
+        # cell centers, +1 cell padding left and right
+        xs = ((np.arange(n_per_row) + 1 / 2 + 1) * cell_width).tolist()
+        ys = (
+            height * 3 / 4 - (np.arange(len(stimuli_arranged)) + 1 / 2) * cell_height
+        ).tolist()
+
+        for label in self.known_stimuli.get("classical_labels_intro", []):
+            self.label_pool.release(label)
 
         labels = []
-        for irow, row in enumerate(stimuli_arranged):
-            for icol, stim in enumerate(row):
+        for y, row in zip(ys, stimuli_arranged):
+            for x, stim in zip(xs, row):
                 template_stim = all_stims[stim]
 
                 # create a new one as stimuli contain c-pointers, which we cannot use deepcopy for
-                text_label = pyglet.text.Label(
+                text_label = self.label_pool.get(
                     text=template_stim.text,
                     color=template_stim.color,
                     font_size=template_stim.font_size,
-                    x=(icol + 1 / 2 + 1)
-                    * cell_width,  # +1/2 to provide center , +1 cell padding left and right
-                    y=(self.window.height * 3 / 4) - (irow + 1 / 2) * cell_height,
-                    anchor_x="center",
-                    anchor_y="center",
+                    x=x,
+                    y=y,
                     batch=batch,
+                    group=group,
                 )
 
                 # sort top left to bottom right
@@ -759,6 +806,7 @@ class StroopContext:
 
     def close_context(self):
         """Close the context stopping all pyglet elements"""
+        self.label_pool.drain()
         if self.has_window_attached:
             self.window.close()
 
@@ -783,9 +831,9 @@ def load_context(language: str = "english", **kwargs) -> StroopContext:
     StroopContext
         An instance of StroopContext initialized with the loaded settings.
     """
-    task_cfg = yaml.safe_load(open("./configs/task.yaml"))
-    language_cfg = yaml.safe_load(open(f"./configs/{language}.yaml"))
-    gui_cfg = yaml.safe_load(open("./configs/gui.yaml"))
+    task_cfg = load_yaml("./configs/task.yaml")
+    language_cfg = load_yaml(f"./configs/{language}.yaml")
+    gui_cfg = load_yaml("./configs/gui.yaml")
 
     kw = {
         **task_cfg["markers"],
@@ -798,6 +846,11 @@ def load_context(language: str = "english", **kwargs) -> StroopContext:
     # use kwargs to overwrite
     kw.update(**kwargs)
 
+    # colors from the config and from the kwargs are converted alike
+    kw["word_color_dict"] = {
+        cw: _to_rgba(cc) for cw, cc in kw["word_color_dict"].items()
+    }
+
     # log the parameters to the data as well
     logger.info(f"Creating StroopContext with {kw=}")
 
@@ -6,7 +6,6 @@ from subprocess import Popen
 from typing import Optional
 
 import pyglet
-import yaml
 from fire import Fire
 
 from stroop_task.context import load_context
@@ -16,6 +15,7 @@ from stroop_task.task_manager import (
     on_draw,
     on_escape_exit_handler,
 )
+from stroop_task.utils.config import load_yaml
 from stroop_task.utils.logging import add_file_handler, logger
 from stroop_task.utils.marker import get_marker_writer
 
@@ -66,7 +66,7 @@ def run_paradigm(
     None
     """
 
-    log_cfg = yaml.safe_load(open("./configs/logging.yaml"))
+    log_cfg = load_yaml("./configs/logging.yaml")
     log_path = Path(log_cfg["log_file"])
     log_path.parent.mkdir(exist_ok=True, parents=True)
     add_file_handler(log_path)
@@ -136,7 +136,7 @@ def run_paradigm_classical(
     The arrangement and colors where drawn randomly once, but are then fixed
     """
 
-    log_cfg = yaml.safe_load(open("./configs/logging.yaml"))
+    log_cfg = load_yaml("./configs/logging.yaml")
     log_path = Path(log_cfg["log_file"])
     log_path.parent.mkdir(exist_ok=True, parents=True)
     add_file_handler(log_path)
@@ -195,7 +195,8 @@ def run_paradigm_classical(
     try:
         pyglet.app.run()
     finally:
-        ctx.close_context()
+        # also stops the recorder and the transcription worker, e.g. on escape
+        smgr.close()
 
 
 def run_paradigm_cli(
@@ -2,7 +2,6 @@ from subprocess import Popen
 
 from fire import Fire
 
-from stroop_task.main import run_paradigm_cli
 from stroop_task.utils.logging import logger
 
 # This is used for integrating with the Dareplane server and just wrapping around
@@ -67,6 +66,10 @@ def run_paradigm(**kwargs):
         increasing the timeout to 60s.
 
     """
+    # imported here so that the server, which only needs `run_block_subprocess`,
+    # does not load pyglet and the audio dependencies
+    from stroop_task.main import run_paradigm_cli
+
     run_paradigm_cli(**kwargs)
 
 
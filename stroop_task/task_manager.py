@@ -87,7 +87,7 @@ class StroopTaskStateManager:
 
         logger.debug("Showing intructions")
         self.ctx.marker_writer.write(self.ctx.startblock_mrk, lsl_marker="start_block")
-        self.ctx.current_stimuli = [self.ctx.known_stimuli["instruction_batch"]]
+        self.ctx.current_stimuli = [self.ctx.show_scene("instruction")]
 
         # Add handler to skip on space press
         self.ctx.window.push_handlers(
@@ -139,15 +139,14 @@ class StroopTaskStateManager:
                 self.ctx.current_stimulus_idx
             ]
 
+            # top stimuli are named <word>_<color>, with XXXX as word if neutral
+            word_top, _, color_top = cw_top.partition("_")
+
             # Move increment to end as otherwise stimulus at idx==0 is not shown
             if self.ctx.focus == "color":
-                correct_direction = (
-                    "right" if cw_top.split("_")[1] == cw_bot else "left"
-                )
+                correct_direction = "right" if color_top == cw_bot else "left"
             elif self.ctx.focus == "text":
-                correct_direction = (
-                    "right" if cw_top.split("_")[0] == cw_bot else "left"
-                )
+                correct_direction = "right" if word_top == cw_bot else "left"
             else:
                 raise ValueError(f"Unknown {self.ctx.focus=}")
 
@@ -157,7 +156,7 @@ class StroopTaskStateManager:
 
             mrk = (
                 self.ctx.congruent_mrk
-                if cw_top in [e for e, _ in self.ctx.word_color_dict.items()]
+                if word_top == color_top
                 else self.ctx.incongruent_mrk
             )
 
@@ -169,7 +168,7 @@ class StroopTaskStateManager:
             self.ctx.marker_writer.write(mrk, lsl_marker=f"{cw_top}|{stim_top}")
 
             # start taking time
-            self.ctx.tic = time.perf_counter()
+            self.ctx.tic_ns = time.perf_counter_ns()
 
             # Set scheduled timeout << if it reaches here, we timed out
             pyglet.clock.schedule_once(self.register_timeout, self.ctx.stimulus_time_s)
@@ -182,7 +181,7 @@ class StroopTaskStateManager:
         self.ctx.current_stimulus_idx += 1
 
     def register_timeout(self, dt):
-        rtime_s = time.perf_counter() - self.ctx.tic
+        rtime_s = (time.perf_counter_ns() - self.ctx.tic_ns) / 1e9
         self.ctx.reactions.append(("TIMEOUT", rtime_s))
         self.ctx.marker_writer.write(
             self.ctx.timeout_mrk, lsl_marker=f"timeout|{rtime_s=}"
@@ -254,7 +253,15 @@ class StroopClassicTaskStateManager:
         self, ctx: StroopContext, random_wait: bool = False, no_audio: bool = False
     ):
         self.ctx = ctx  # the context under which to operate
-        self.audio_recorder = SpokenStroopRecorder()
+        # the recorder starts the transcription worker if configured, which then
+        # loads the Whisper model while the block is running
+        self.audio_recorder = (
+            None
+            if no_audio
+            else SpokenStroopRecorder(
+                language=ctx.language, words=list(ctx.word_color_dict)
+            )
+        )
         # if `transcribe_audio`, the audio will be transcribed using a Whisper model after the block
         self.no_audio = no_audio
         self.random_wait = random_wait
@@ -268,7 +275,7 @@ class StroopClassicTaskStateManager:
             self.ctx.startblock_mrk, lsl_marker="start_block_classic"
         )
 
-        self.ctx.current_stimuli = [self.ctx.known_stimuli["classical_batch"]]
+        self.ctx.current_stimuli = [self.ctx.show_scene("classical")]
 
         # start the timeout
         pyglet.clock.schedule_once(
@@ -292,9 +299,7 @@ class StroopClassicTaskStateManager:
             )
         )
 
-        self.ctx.current_stimuli = [
-            self.ctx.known_stimuli["instruction_batch_classical"]
-        ]
+        self.ctx.current_stimuli = [self.ctx.show_scene("instruction_classical")]
 
     def end_block(self):
 
@@ -311,14 +316,33 @@ class StroopClassicTaskStateManager:
                 stim.draw()
 
             logger.info("persisting audio")
-            self.audio_recorder.persist_accumulated()
+            self.audio_recorder.persist_accumulated(wait_for_transcription=False)
+
+        self.tic_end_block = time.perf_counter()
+        pyglet.clock.schedule_once(self.close_when_transcribed, delay=2)
+
+    def close_when_transcribed(self, dt):
+        """Close once a pending transcription is done, the fixation stays on
+        screen and the window responsive until then, but at most for the
+        `max_wait_s` configured in `configs/audio.yaml`"""
+        if self.audio_recorder is not None and not self.audio_recorder.result_ready():
+            waited_s = time.perf_counter() - self.tic_end_block
+            if waited_s < self.audio_recorder.max_wait_s:
+                pyglet.clock.schedule_once(self.close_when_transcribed, delay=0.1)
+                return
+
+            logger.warning(f"No transcription after {waited_s=:.1f}, closing")
 
-        pyglet.clock.schedule_once(lambda dt: self.close(), delay=2)
+        self.close()
 
     def close(self):
+        """Stop the recorder and close the context, a pending transcription is
+        persisted if it arrives within a second"""
+        if self.audio_recorder is not None:
+            self.audio_recorder.persist_transcription(timeout=1)
+            self.audio_recorder.close()
+            self.audio_recorder = None
         self.ctx.close_context()
-        del self.audio_recorder
-        pass
 
 
 # ----------------------------------------------------------------------------
@@ -354,7 +378,7 @@ def on_key_press_handler(
             if symbol == pyglet.window.key.DOWN and not smgr.down_pressed:
                 # start tracking
                 smgr.down_pressed = True
-                ctx.tic_down = time.perf_counter()
+                ctx.tic_down_ns = time.perf_counter_ns()
                 logger.info("Arrow down pressed")
                 pyglet.clock.unschedule(
                     smgr.next_state
@@ -399,9 +423,9 @@ def on_key_release_handler(
             match symbol:
                 case pyglet.window.key.DOWN:
                     smgr.down_pressed = False
-                    tnow = time.perf_counter()
-                    dt_s = tnow - ctx.tic_down
-                    dtstim_s = tnow - ctx.tic
+                    tnow_ns = time.perf_counter_ns()
+                    dt_s = (tnow_ns - ctx.tic_down_ns) / 1e9
+                    dtstim_s = (tnow_ns - ctx.tic_ns) / 1e9
                     logger.info(
                         f"Arrow down released after {dt_s=}, compared to stim onset {dtstim_s=}"
                     )
@@ -417,7 +441,7 @@ def handle_reaction(key: str, ctx: StroopContext, smgr: StroopTaskStateManager):
     First track the time, then deactivate scheduled callbacks and manually
     trigger the next callback
     """
-    rtime_s = time.perf_counter() - ctx.tic
+    rtime_s = (time.perf_counter_ns() - ctx.tic_ns) / 1e9
     ctx.reactions.append((key, rtime_s))
     ctx.marker_writer.write(ctx.reaction_mrk, lsl_marker=f"reaction_{key}|{rtime_s=}")
     logger.info(f"Reaction time: {rtime_s=}")
@@ -0,0 +1,41 @@
+import copy
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import yaml
+
+# use the LibYAML based parser if PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+@lru_cache(maxsize=None)
+def _load_yaml(path: str, mtime: float) -> dict:
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def load_yaml(path: str | Path) -> dict:
+    """
+    Load a YAML configuration file, parsing each file only once per process.
+
+    The parsed content is cached by the resolved path and modification time, so
+    changes to a config file are still picked up and relative paths stay
+    correct after a change of the working directory.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path to the YAML file, e.g. "./configs/task.yaml".
+
+    Returns
+    -------
+    dict
+        A copy of the parsed configuration, which can be modified by the caller
+        without affecting the cache.
+    """
+    path = os.path.realpath(path)
+    return copy.deepcopy(_load_yaml(path, os.path.getmtime(path)))
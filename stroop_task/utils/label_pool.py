@@ -0,0 +1,81 @@
+# A pool of pyglet Labels to reuse them instead of allocating new ones each
+# time a table of stimuli is (re-)created.
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+import pyglet
+
+
+class LabelPool:
+    """Keep released labels to reuse them, grouped by
+    (font_size, anchor_x, anchor_y) as these define the layout of a label.
+    """
+
+    def __init__(self):
+        self._free: dict[tuple, list[pyglet.text.Label]] = defaultdict(list)
+        self._active: dict[tuple, set[pyglet.text.Label]] = defaultdict(set)
+
+    def get(
+        self,
+        text: str,
+        color: tuple,
+        x: float,
+        y: float,
+        batch: pyglet.graphics.Batch | None = None,
+        group: pyglet.graphics.Group | None = None,
+        font_size: int = 36,
+        anchor_x: str = "center",
+        anchor_y: str = "center",
+    ) -> pyglet.text.Label:
+        """Get a label from the pool or create a new one if none is free"""
+        key = (font_size, anchor_x, anchor_y)
+
+        if self._free[key]:
+            label = self._free[key].pop()
+            label.begin_update()
+            label.text = text
+            label.color = color
+            label.position = (x, y, label.z)
+            label.batch = batch
+            if label.group is not group:
+                label.group = group
+            label.end_update()
+        else:
+            label = pyglet.text.Label(
+                text=text,
+                color=color,
+                font_size=font_size,
+                x=x,
+                y=y,
+                anchor_x=anchor_x,
+                anchor_y=anchor_y,
+                batch=batch,
+                group=group,
+            )
+
+        self._active[key].add(label)
+        return label
+
+    def is_active(self, label: pyglet.text.Label) -> bool:
+        """Check if `label` was handed out by the pool and not released yet"""
+        return any(label in active for active in self._active.values())
+
+    def release(self, label: pyglet.text.Label):
+        """Return a label to the pool, removing it from its batch"""
+        key = (label.font_size, label.anchor_x, label.anchor_y)
+        if label not in self._active[key]:
+            return  # already released
+
+        self._active[key].remove(label)
+        label.batch = None
+        self._free[key].append(label)
+
+    def drain(self):
+        """Delete all labels managed by the pool"""
+        for labels in [*self._free.values(), *self._active.values()]:
+            for label in labels:
+                label.delete()
+        self._free.clear()
+        self._active.clear()
@@ -1,8 +1,8 @@
 import serial
-import yaml
 from dareplane_utils.general.time import sleep_s
 from pylsl import StreamInfo, StreamOutlet
 
+from stroop_task.utils.config import load_yaml
 from stroop_task.utils.logging import logger
 
 
@@ -207,7 +207,7 @@ def get_marker_writer(**kwargs) -> MarkerWriter:
     >>> writer.write(data=123, lsl_marker="Test Marker")
     1
     """
-    mrk_cfg = yaml.safe_load(open("./configs/marker_writer.yaml"))
+    mrk_cfg = load_yaml("./configs/marker_writer.yaml")
     mrk_cfg.update(**kwargs)
     mw = MarkerWriter(**mrk_cfg)
     return mw
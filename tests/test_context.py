@@ -1,3 +1,6 @@
+import ast
+import shutil
+
 import pyglet
 import pytest
 import yaml
@@ -27,7 +30,31 @@ def test_dutch_loading():
     words_cfg = yaml.safe_load(open("./configs/dutch.yaml"))
 
     for k, v in words_cfg["words"].items():
-        assert ctx.word_color_dict[k] == v  # the default for now
+        assert ctx.word_color_dict[k] == ast.literal_eval(v)
+
+
+def test_list_colors_loading(tmp_path, monkeypatch):
+    (tmp_path / "configs").mkdir()
+    for cfg in ["task.yaml", "gui.yaml", "marker_writer.yaml"]:
+        shutil.copy(f"./configs/{cfg}", tmp_path / "configs" / cfg)
+    language_cfg = yaml.safe_load(open("./configs/english.yaml"))
+    language_cfg["words"] = {
+        k: list(ast.literal_eval(v)) for k, v in language_cfg["words"].items()
+    }
+    with open(tmp_path / "configs" / "list_colors.yaml", "w") as f:
+        yaml.safe_dump(language_cfg, f)
+
+    monkeypatch.chdir(tmp_path)
+    ctx = load_context_test(language="list_colors")
+
+    for k, v in language_cfg["words"].items():
+        assert ctx.word_color_dict[k] == tuple(v)
+
+
+def test_color_overwrite():
+    ctx = load_context_test(word_color_dict={"red": "(255, 0, 0, 255)"})
+
+    assert ctx.word_color_dict == {"red": (255, 0, 0, 255)}
 
 
 def test_ctx_overwrite():
@@ -78,3 +105,49 @@ def test_ctx_stimuli_balance():
     assert len(coh_correct) == len(coh_incorrect)
     assert len(icoh_correct) == len(icoh_incorrect)
     assert len(neut_correct) == len(neut_incorrect)
+
+
+def test_ctx_scene_rebuild(monkeypatch):
+    # record which drawables were deleted, while still deleting them
+    deleted = set()
+
+    def recording_delete(delete):
+        def wrapped(self):
+            deleted.add(id(self))
+            delete(self)
+
+        return wrapped
+
+    for cls in [pyglet.text.Label, pyglet.sprite.Sprite]:
+        monkeypatch.setattr(cls, "delete", recording_delete(cls.delete))
+
+    def n_labels(pooled):
+        return sum(len(labels) for labels in pooled.values())
+
+    ctx = load_context_test()
+    ctx.add_window(pyglet.window.Window(fullscreen=False, height=800, width=1200))
+
+    ctx.create_stimuli()
+    ctx.init_classical()
+
+    old_drawables = [stim for stims in ctx._scene_drawables.values() for stim in stims]
+    n_active = n_labels(ctx.label_pool._active)
+    n_free = n_labels(ctx.label_pool._free)
+    assert n_active > 0
+
+    # changed messages rebuild all scenes
+    ctx.msgs = {**ctx.msgs, "instruction_footer": "Press space to continue"}
+    ctx.create_stimuli()
+    ctx.init_classical()
+    ctx.init_classical()
+
+    # old drawables are either deleted, back in the pool or reused by a scene
+    current = {id(stim) for stims in ctx._scene_drawables.values() for stim in stims}
+    for stim in old_drawables:
+        assert id(stim) in deleted or id(stim) in current or stim.batch is None
+
+    # the pool labels are reused instead of new ones being created
+    assert n_labels(ctx.label_pool._active) == n_active
+    assert n_labels(ctx.label_pool._free) == n_free
+
+    ctx.close_context()
@@ -0,0 +1,60 @@
+import pyglet
+import pytest
+
+from stroop_task.utils.label_pool import LabelPool
+
+
+@pytest.fixture
+def window():
+    # labels need a GL context for their glyphs
+    wd = pyglet.window.Window(fullscreen=False, height=400, width=600)
+    yield wd
+    wd.close()
+
+
+def test_get_release_reuse(window):
+    pool = LabelPool()
+    batch, group = pyglet.graphics.Batch(), pyglet.graphics.Group(order=0)
+
+    label = pool.get("red", (255, 0, 0, 255), x=10, y=20, batch=batch, group=group)
+    assert pool.is_active(label)
+    assert label.batch is batch and label.group is group
+
+    pool.release(label)
+    assert not pool.is_active(label)
+    assert label.batch is None
+
+    # releasing twice does not put the label into the pool twice
+    pool.release(label)
+
+    # a released label of the same layout is reused, re-batched and re-grouped
+    new_batch, new_group = pyglet.graphics.Batch(), pyglet.graphics.Group(order=1)
+    reused = pool.get(
+        "blue", (0, 0, 255, 255), x=30, y=40, batch=new_batch, group=new_group
+    )
+    assert reused is label
+    assert reused.text == "blue"
+    assert tuple(reused.color) == (0, 0, 255, 255)
+    assert (reused.x, reused.y) == (30, 40)
+    assert reused.batch is new_batch and reused.group is new_group
+
+    # no free label left -> a new one is created
+    other = pool.get("green", (0, 255, 0, 255), x=0, y=0, batch=new_batch)
+    assert other is not label
+
+    # a different layout does not reuse the free labels
+    pool.release(other)
+    large = pool.get("green", (0, 255, 0, 255), x=0, y=0, font_size=72)
+    assert large is not other
+
+
+def test_drain(window):
+    pool = LabelPool()
+    active = pool.get("red", (255, 0, 0, 255), x=0, y=0)
+    pool.release(pool.get("blue", (0, 0, 255, 255), x=0, y=0))
+
+    pool.drain()
+
+    assert not pool.is_active(active)
+    # nothing is reused after draining
+    assert pool.get("red", (255, 0, 0, 255), x=0, y=0) is not active
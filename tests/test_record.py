@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from stroop_task.audio.record import expand_rectified, recording_to_rectified
+
+
+def windowed_abs_max(recording: np.ndarray, n_mean: int) -> np.ndarray:
+    return np.asarray(
+        [
+            np.abs(recording[i : i + n_mean]).max()
+            for i in range(0, len(recording), n_mean)
+        ]
+    )
+
+
+@pytest.mark.parametrize("n_samples", [3200, 3210])  # n_mean = 320 at 16kHz
+def test_rectified_windows(n_samples):
+    rng = np.random.default_rng(42)
+    rec = rng.uniform(-1, 1, n_samples).astype(np.float32)
+
+    rect, n_mean = recording_to_rectified(rec, n_levels=20, fs=16_000)
+
+    assert n_mean == 320
+    assert len(rect) == -(-n_samples // n_mean)  # the partial tail is one window
+    assert rect.min() == 0 and rect.max() == 20
+
+    # the envelope is monotonic in the window maxima
+    ref = windowed_abs_max(rec, n_mean)
+    assert np.all(np.diff(rect[np.argsort(ref)].astype(int)) >= 0)
+
+    assert len(expand_rectified(rect, n_mean)) >= n_samples
+
+
+def test_rectified_silent_recording():
+    rect, _ = recording_to_rectified(np.zeros(1000, dtype=np.float32))
+
+    assert np.all(rect == 0)